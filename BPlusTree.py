@@ -1,20 +1,65 @@
-from math import ceil
-from typing import Callable, Iterator, Optional, List
+from array import array
+from collections import deque
+from itertools import chain
+from operator import itemgetter
+from typing import Callable, Iterable, Iterator, Optional, List, Tuple
 from logging import getLogger
+from warnings import warn
 from bisect import bisect_right, bisect_left
 
 logger = getLogger('BPlusTree_Logger')
 
+def _identity(key):
+    """The default hashing function, bypassed by the tree operations."""
+    return key
+
+def _group_sizes(total: int, fill: int, least: int, most: int) -> List[int]:
+    """Split a number of elements into groups for bulk loading.
+
+    Groups are filled up to the given size, the last group is merged with or rebalanced against
+    the previous one if it is below the minimum size.
+
+    Args:
+        total (int): the number of elements to group
+        fill (int): the preferred group size
+        least (int): the minimum group size, ignored if there is a single group
+        most (int): the maximum group size
+
+    Returns:
+        list: the size of each group
+
+    """
+    sizes = [fill] * (total // fill)
+    if total % fill:
+        sizes.append(total % fill)
+    if len(sizes) > 1 and sizes[-1] < least:
+        last = sizes.pop() + sizes.pop()
+        sizes += [last] if last <= most else [last // 2, last - last // 2]
+    return sizes
+
 class BPlusTree_Node(object):
     """The node object in a B+ Tree
 
     Args:
         order (int): The order of the tree
         parent (BPlusTree_Node): The parent node of the new node
+        int_keys (bool): True to store keys in a compact array of 64-bit signed integers
+        value_dtype (str): The array typecode to store values in a compact array, None for a list
 
     Attributes:
+        _parent (BPlusTree_Node): The parent node, None for root
+        _left (BPlusTree_Node): The brother node on the left
+        _right (BPlusTree_Node): The brother node on the right
+        _next (BPlusTree_Node): The next leaf node (For leaf nodes only, None otherwise)
+        _keys (list): The sorted list of keys in current node (array of int64 if int_keys is set)
+        _values (list): The list of values in current node (For leaf nodes only, array if value_dtype is set)
+        _children (list): The list of child nodes (Empty for leaf nodes)
+        _level (int): The level of current node counted from the leaves, 0 for leaf nodes
+        _min_keys (int): The minimum number of keys in a non-root node, ceil(order/2)-1
 
     """
+    __slots__ = ('_order', '_parent', '_left', '_right', '_next', '_keys', '_values', '_children', '_level', '_min_keys')
+
     #region Properties
 
     @property
@@ -22,86 +67,6 @@ class BPlusTree_Node(object):
         """Return the BPlusTree order as integer. (Read-only)"""
         return self._order
 
-    @property
-    def parent(self) -> Optional['BPlusTree_Node']:
-        """Return the parent node."""
-        return self._parent
-
-    @parent.setter
-    def parent(self, value: 'BPlusTree_Node'):
-        if value and not isinstance(value, BPlusTree_Node):
-            raise ValueError('Parent must be a BPlusTree_Node instance.')
-        self._parent = value
-
-    @property
-    def children(self) -> List['BPlusTree_Node']:
-        """Return the list of child nodes."""
-        return self._children
-
-    @children.setter
-    def children(self, value: List['BPlusTree_Node']):
-        if not isinstance(value, list):
-            raise ValueError('Children must be a list of BPlusTree_Node instance.')
-        self._children = value
-
-    @property
-    def left(self) -> Optional['BPlusTree_Node']:
-        """Return the brother node on the left."""
-        return self._left
-
-    @left.setter
-    def left(self, value: Optional['BPlusTree_Node']):
-        if value and not isinstance(value, BPlusTree_Node):
-            raise ValueError('Left must be a BPlusTree_Node instance.')
-        self._left = value
-
-    @property
-    def right(self) -> Optional['BPlusTree_Node']:
-        """Return the brother node on the right."""
-        return self._right
-
-    @right.setter
-    def right(self, value: Optional['BPlusTree_Node']):
-        if value and not isinstance(value, BPlusTree_Node):
-            raise ValueError('Right must be a BPlusTree_Node instance.')
-        self._right = value
-
-    @property
-    def next(self) -> Optional['BPlusTree_Node']:
-        """Return the next leaf node. (For leaf nodes only, None otherwise)"""
-        return self._next
-
-    @next.setter
-    def next(self, value: Optional['BPlusTree_Node']):
-        if value is not None:
-            if not isinstance(value, BPlusTree_Node):
-                raise ValueError('Next must be a BPlusTree_Node instance.')
-            elif not value.leaf:
-                raise ValueError('Next must be a leaf node instance.')
-        self._next = value
-
-    @property
-    def keys(self) -> list:
-        """Return the list of keys in current node."""
-        return self._keys
-
-    @keys.setter
-    def keys(self, value: list):
-        if not isinstance(value, list):
-            raise ValueError('Keys must be a list of int instance.')
-        self._keys = value
-
-    @property
-    def values(self) -> list:
-        """Return the list of values in current node. (For leaf nodes only)"""
-        return self._values
-
-    @values.setter
-    def values(self, value: list):
-        if not isinstance(value, list):
-            raise ValueError('Values must be a list instance.')
-        self._values = value
-
     @property
     def full(self) -> bool:
         """Return True if splitting is needed. (Read-only)"""
@@ -110,56 +75,71 @@ class BPlusTree_Node(object):
     @property
     def empty(self) -> bool:
         """Return True if no key left. (Read-only)"""
-        return len(self._keys) <= 0
+        return not self._keys
 
     @property
     def valid(self) -> bool:
         """Return True if the number of keys meets the minimum requirement. (Read-only)"""
-        return self.root or len(self.keys) >= ceil(self._order/2)-1
+        return self._parent is None or len(self._keys) >= self._min_keys
 
     @property
     def borrowable(self) -> bool:
         """Return True if the number of keys is more than minimum requirement. (Read-only)"""
-        return len(self.keys) > ceil(self._order/2)-1
+        return len(self._keys) > self._min_keys
 
     @property
     def leaf(self) -> bool:
         """Return True if current node is a leaf node. (Read-only)"""
-        return len(self._children) == 0
+        return not self._children
 
     @property
     def root(self) -> bool:
         """Return True if current node is a root node. (Read-only)"""
-        return not self._parent
+        return self._parent is None
+
+    @property
+    def level(self) -> int:
+        """Return the level of current node, 0 for leaf nodes. (Read-only)"""
+        return self._level
 
     @property
     def height(self) -> int:
-        """Return the height of current node, 0 for root. (Read-only)"""
-        tmp, h = self.parent, 0
+        """Return the height of current node, 0 for root. (Read-only, walks up to the root, prefer level)"""
+        tmp, h = self._parent, 0
         while tmp is not None:
-            tmp = tmp.parent
+            tmp = tmp._parent
             h += 1
         return h
 
     #endregion
 
-    def __init__(self, order: int, parent: 'BPlusTree_Node' = None):
+    def __init__(self, order: int, parent: 'BPlusTree_Node' = None, int_keys: bool = False, value_dtype: Optional[str] = None):
         self._order = order
+        self._min_keys = (order+1)//2-1
         self._parent = parent
         self._left = self._right = self._next = None
-        self._keys, self._values, self._children = [], [], [] # We use list here instead of dict to have a sorted order for keys
+        self._keys = array('q') if int_keys else [] # We use list here instead of dict to have a sorted order for keys
+        self._values = array(value_dtype) if value_dtype else []
+        self._children = []
+        self._level = 0
 
 class BPlusTree:
     """The B+ Tree object
 
     Args:
-        order (int): The order of the tree
-        parent (BPlusTree_Node): The parent node of the new node
+        order (int): The order of the tree, 64 by default (orders below 16 make the tree mostly pointer chasing)
+        hash_func (Callable): The custom hashing function, None for identity
+        int_keys (bool): True to store hashed keys as 64-bit signed integers in compact arrays
+        value_dtype (str): The array typecode to store primitive values in compact arrays (e.g. 'q'), None for lists
 
     Attributes:
         hash_func (Callable): The custom hashing function
         len (int): The total number of elements in the tree
 
+    Note:
+        The keyword-only `_br` and `_bl` arguments of the methods bind bisect_right and bisect_left
+        as local variables to skip the global lookups on hot paths. They are internal and shall not be passed.
+
     """
     #region Properties
 
@@ -178,131 +158,197 @@ class BPlusTree:
         """ Return the first leaf node on the left. """
         return self._leaf
 
+    @property
+    def hash_func(self) -> Callable:
+        """ Return the hashing function. """
+        return self._hash_func
+
+    @hash_func.setter
+    def hash_func(self, value: Optional[Callable]):
+        if value is None:
+            value = _identity
+        if not callable(value):
+            raise ValueError('Hash function is not callable.')
+        self._hash_func = value
+        self._hash_identity = value is _identity # skip the call for identity hashing
+
     #endregion
 
-    def __init__(self, order: int, hash_func: Callable = lambda x: x):
+    def __init__(self, order: int = 64, hash_func: Optional[Callable] = None, int_keys: bool = False, value_dtype: Optional[str] = None):
         if not isinstance(order, int):
             raise ValueError('Order has to be integer.')
+        if order < 16:
+            warn(f'Order {order} is small, tree operations will be dominated by node traversal. Consider an order of 64.', RuntimeWarning, stacklevel=2)
         self._order = order
-        if not callable(hash_func):
-            raise ValueError('Hash function is not callable.')
         self.hash_func = hash_func
         self.len = 0
-        self._leaf = self._root = BPlusTree_Node(self._order)
+        self._int_keys = int_keys
+        self._value_dtype = value_dtype
+        self._min_keys = (order+1)//2-1 # minimum number of keys in a non-root node, ceil(order/2)-1
+        self._leaf = self._root = self._last_leaf = BPlusTree_Node(self._order, int_keys=int_keys, value_dtype=value_dtype)
 
     #region Private methods
 
-    def _split_node(self, node: BPlusTree_Node) -> None:
+    def _split_node(self, path: List[BPlusTree_Node], indexes: List[int]) -> None:
         """Split a node if the number of elements exceeded the maximum.
 
         Split the target node with the key in the middle and add the splitting key into its parent node.
-        Then a recursive check will be applied to the parent node. 
+        Then the same check will be applied to the parent node, walking the descent path back up to the root. 
         Returns when the target node meets the rule.
 
         Args:
-            node (BPlusTree_Node): the target node to check and split
+            path (list): the nodes from root to the target node to check and split
+            indexes (list): the position of each node of the path (except root) among its parent's children
 
         Returns:
             None
 
         """
-        if not node.full:
-            return
-        pos = int(len(node.keys)/2) # compute split position
-        if node.root: # if splitting a root node
-            self._root = node.parent = BPlusTree_Node(self._order)
-            node.parent.children.append(node)
-        new = BPlusTree_Node(self._order, node.parent) # create a new node on the right hand side
-        new.left, new.right, node.right = node, node.right, new
-        if new.right: # if nodes exist on the right side of new node
-            new.right.left = new
-        split_key = node.keys[pos] # the key to be inserted into parent node
-        if node.leaf:
-            node.keys, new.keys = node.keys[:pos], node.keys[pos:]
-            node.values, new.values = node.values[:pos], node.values[pos:]
-            node.next, new.next = new, node.next
-        else: # inner node
-            node.keys, new.keys = node.keys[:pos], node.keys[pos+1:]
-            node.children, new.children = node.children[:pos+1], node.children[pos+1:]
-            node.children[-1].right = new.children[0].left = None # no longer brothers due to parent splitting
-            for n in new.children:
-                n.parent = new
-        pos = bisect_right(node.parent.keys, split_key) # insert position in parent node
-        node.parent.keys.insert(pos, split_key)
-        node.parent.children.insert(pos+1, new)
-        self._split_node(node.parent) # recursively check parent nodes
-
-    def _fix_node(self, node: BPlusTree_Node) -> None:
+        order = self._order
+        for i in range(len(path)-1, -1, -1):
+            node = path[i]
+            if len(node._keys) < order:
+                return
+            pos = int(len(node._keys)/2) # compute split position
+            if i: # parent node and position are recorded in the path
+                parent, idx = path[i-1], indexes[i-1]
+            else: # if splitting a root node
+                self._root = node._parent = parent = BPlusTree_Node(order, int_keys=self._int_keys)
+                parent._level = node._level + 1
+                parent._children.append(node)
+                idx = 0
+            new = BPlusTree_Node(order, parent, self._int_keys, None if node._children else self._value_dtype) # create a new node on the right hand side, only leaves store values
+            new._level = node._level
+            new._left, new._right, node._right = node, node._right, new
+            if new._right: # if nodes exist on the right side of new node
+                new._right._left = new
+            split_key = node._keys[pos] # the key to be inserted into parent node
+            if not node._children: # leaf node, move the right half and truncate in place
+                new._keys, new._values = node._keys[pos:], node._values[pos:]
+                del node._keys[pos:], node._values[pos:]
+                node._next, new._next = new, node._next
+                if new._next is None: # new node becomes the last leaf node
+                    self._last_leaf = new
+            else: # inner node, the key at split position goes up to the parent node
+                new._keys, new._children = node._keys[pos+1:], node._children[pos+1:]
+                del node._keys[pos:], node._children[pos+1:]
+                node._children[-1]._right = new._children[0]._left = None # no longer brothers due to parent splitting
+                for n in new._children:
+                    n._parent = new
+            parent._keys.insert(idx, split_key) # the splitting key goes right after the node's position
+            parent._children.insert(idx+1, new)
+
+    def _fix_node(self, path: List[BPlusTree_Node], indexes: List[int]) -> None:
         """Fix a node if the number of elements doesn't meet the minimum requirement.
 
-        Fix the node after deletion by either borrowing an element or being merged with one of its brother node.
+        Fix the node after deletion by either borrowing elements or being merged with one of its brother node.
+        Leaf nodes borrow half of the difference at once to even out with their brother, so that
+        consecutive deletions do not trigger a borrowing each time, and a leaf node missing several
+        keys after a batch deletion is fixed in one step.
         Splitting key at the parent node will be updated or removed.
-        Then a recursive check will be applied to the parent node. 
+        Then the same check will be applied to the parent node after a merge, walking the descent path back up to the root. 
         Returns when the target node meets the rule.
 
         Args:
-            node (BPlusTree_Node): the target node to check and fix
+            path (list): the nodes from root to the target node to check and fix
+            indexes (list): the position of each node of the path (except root) among its parent's children
 
         Returns:
             None
 
         """
-        if node.root and (not node.leaf) and node.empty: # remove empty root
-            self._root = node.children.pop()
-            self._root.parent = None
-        if node.valid:
-            return
-        if node.left and node.left.borrowable: # if possible to borrow an element from brother node on the left
-            split_key = node.left.keys.pop()
-            pos = bisect_left(node.parent.keys, split_key) # update key in parent node
-            if node.leaf:
-                key = split_key
-                node.values.insert(0, node.left.values.pop())
-            else: # inner nodes
-                key = node.parent.keys[pos]
-                child = node.left.children.pop()
-                if child.left:
-                    child.left.right = None
-                child.parent, child.left, child.right = node, None, node.children[0]
-                node.children[0].left = child
-                node.children.insert(0, child)
-            node.keys.insert(0, key)
-            node.parent.keys[pos] = split_key
-        elif node.right and node.right.borrowable: # if possible to borrow an element from brother node on the right
-            split_key = node.right.keys.pop(0)
-            pos = bisect_right(node.parent.keys, split_key) # update key in parent node
-            if node.leaf:
-                key, split_key = split_key, node.right.keys[0]
-                node.values.append(node.right.values.pop(0))
-            else: # inner nodes
-                key = node.parent.keys[pos-1]
-                child = node.right.children.pop(0)
-                if child.right:
-                    child.right.left = None
-                child.parent, child.left, child.right = node, node.children[-1], None
-                node.children[-1].right = child
-                node.children.append(child)
-            node.keys.append(key)
-            node.parent.keys[pos-1] = split_key
-        else: # merge with brother on the left or on the right
-            merge_left, merge_right = (node.left, node) if node.left else (node, node.right)
-            pos = bisect_right(merge_left.parent.keys, merge_left.keys[0]) # remove key and child in parent node
-            split_key = merge_left.parent.keys.pop(pos)
-            merge_left.parent.children.pop(pos+1)
-            merge_left.keys += merge_right.keys
-            merge_left.right = merge_right.right
-            if merge_right.right:
-                merge_right.right.left = merge_left
-            if merge_left.leaf:
-                merge_left.values += merge_right.values
-                merge_left.next = merge_right.next
-            else:
-                merge_left.keys.insert(len(merge_left.children)-1, split_key)
-                merge_left.children[-1].right, merge_right.children[0].left = merge_right.children[0], merge_left.children[-1]
-                merge_left.children += merge_right.children
-                for n in merge_right.children:
-                    n.parent = merge_left
-            self._fix_node(merge_left.parent) # recursively check parent nodes
+        node_min = self._min_keys
+        pair_min = 2*node_min # two brothers holding fewer keys than this are merged
+        for i in range(len(path)-1, -1, -1):
+            node = path[i]
+            if not i: # root node
+                if node._children and not node._keys: # remove empty root
+                    self._root = node._children.pop()
+                    self._root._parent = None
+                return
+            size = len(node._keys)
+            if size >= node_min:
+                return
+            parent, idx = path[i-1], indexes[i-1] # splitting keys with brothers are at idx-1 and idx in parent node
+            left, right = node._left, node._right
+            if left is not None and len(left._keys)+size >= pair_min: # if possible to borrow from brother node on the left
+                if not node._children: # leaf node, move half of the difference in one go
+                    n = (len(left._keys)-size) >> 1
+                    node._keys[:0] = left._keys[-n:]
+                    node._values[:0] = left._values[-n:]
+                    del left._keys[-n:], left._values[-n:]
+                    split_key = node._keys[0]
+                else: # inner nodes
+                    split_key = left._keys.pop()
+                    child = left._children.pop()
+                    if child._left:
+                        child._left._right = None
+                    child._parent, child._left, child._right = node, None, node._children[0]
+                    node._children[0]._left = child
+                    node._children.insert(0, child)
+                    node._keys.insert(0, parent._keys[idx-1])
+                parent._keys[idx-1] = split_key # update key in parent node
+                return
+            elif right is not None and len(right._keys)+size >= pair_min: # if possible to borrow from brother node on the right
+                if not node._children: # leaf node, move half of the difference in one go
+                    n = (len(right._keys)-size) >> 1
+                    node._keys += right._keys[:n]
+                    node._values += right._values[:n]
+                    del right._keys[:n], right._values[:n]
+                    split_key = right._keys[0]
+                else: # inner nodes
+                    split_key = right._keys.pop(0)
+                    child = right._children.pop(0)
+                    if child._right:
+                        child._right._left = None
+                    child._parent, child._left, child._right = node, node._children[-1], None
+                    node._children[-1]._right = child
+                    node._children.append(child)
+                    node._keys.append(parent._keys[idx])
+                parent._keys[idx] = split_key # update key in parent node
+                return
+            else: # merge with brother on the left or on the right, then check parent nodes
+                if left is not None:
+                    merge_left, merge_right, pos = left, node, idx-1
+                else:
+                    merge_left, merge_right, pos = node, right, idx
+                split_key = parent._keys.pop(pos) # remove key and child in parent node
+                parent._children.pop(pos+1)
+                merge_left._keys.extend(merge_right._keys)
+                merge_left._right = merge_right._right
+                if merge_right._right:
+                    merge_right._right._left = merge_left
+                if not merge_left._children: # leaf node
+                    merge_left._values.extend(merge_right._values)
+                    merge_left._next = merge_right._next
+                    if merge_left._next is None: # merged node becomes the last leaf node
+                        self._last_leaf = merge_left
+                else:
+                    merge_left._keys.insert(len(merge_left._children)-1, split_key)
+                    merge_left._children[-1]._right, merge_right._children[0]._left = merge_right._children[0], merge_left._children[-1]
+                    merge_left._children.extend(merge_right._children)
+                    for n in merge_right._children:
+                        n._parent = merge_left
+
+    def _last_path(self) -> Tuple[List[BPlusTree_Node], List[int]]:
+        """Find the descent path to the last leaf node on the right.
+
+        Iterates from root through the last child of each node. 
+
+        Returns:
+            list: the nodes from root to the last leaf node
+            list: the position of each node of the path (except root) among its parent's children
+
+        """
+        node = self._root
+        path, indexes = [node], []
+        children = node._children
+        while children:
+            indexes.append(len(children)-1)
+            node = children[-1]
+            path.append(node)
+            children = node._children
+        return path, indexes
 
     def _find_target_leaf(self, key) -> BPlusTree_Node:
         """Find the corresponding leaf node by the target key value.
@@ -316,13 +362,48 @@ class BPlusTree:
             BPlusTree_Node: the leaf node of destination
             
         """
-        temp = self._root
-        while not temp.leaf: # iterate to the target leaf node
-            pos = bisect_right(temp.keys, key)
-            temp = temp.children[pos]
-        return temp
+        return self._locate(key)[0]
+
+    def _locate(self, hash_key, *, _br=bisect_right, _bl=bisect_left) -> Tuple[BPlusTree_Node, int, bool]:
+        """Locate a hashed key in its leaf node.
 
-    def _iterate_by_slice(self, slice_: Optional[slice]) -> Iterator[tuple]:
+        Iterates once from root to the leaf node, then searches the position of the key in this leaf. 
+
+        Args:
+            hash_key (Any): the hashed key to locate
+
+        Returns:
+            BPlusTree_Node: the leaf node of destination
+            int: the position of the key in the leaf node, or the insert location if not found
+            bool: True if the key exists in the tree
+
+        """
+        # bisect is used whatever the node size: in CPython, a Python-level linear scan
+        # stays slower than the C implementation of bisect even for a handful of keys
+        leaf = self._root
+        children = leaf._children
+        while children: # iterate to the target leaf node
+            leaf = children[_br(leaf._keys, hash_key)]
+            children = leaf._children
+        keys = leaf._keys
+        pos = _bl(keys, hash_key)
+        return leaf, pos, pos < len(keys) and keys[pos] == hash_key
+
+    def _iterate_leaves(self) -> Iterator[BPlusTree_Node]:
+        """Iterates leaf nodes from left to right
+
+        Follows the linked list of leaf nodes, starting from the first leaf node on the left.
+
+        Returns:
+            Iterator: a generator of leaf nodes
+
+        """
+        leaf = self._leaf
+        while leaf is not None:
+            yield leaf
+            leaf = leaf._next
+
+    def _iterate_by_slice(self, slice_: Optional[slice], *, _bl=bisect_left) -> Iterator[tuple]:
         """Iterates (key, value) pair in a given interval
 
         Iterates all records if interval is not given. 
@@ -341,11 +422,12 @@ class BPlusTree:
         if not slice_: # begins from the first leaf node if slice is not given
             leaf = self._leaf
             pos = 0
+            hash_stop = None
         elif slice_.step is not None:
             raise ValueError('Custom step is not supported.')
         else:
-            hash_start = self.hash_func(slice_.start) if slice_.start is not None else None
-            hash_stop = self.hash_func(slice_.stop) if slice_.stop is not None else None
+            hash_start = self._hash_func(slice_.start) if slice_.start is not None else None
+            hash_stop = self._hash_func(slice_.stop) if slice_.stop is not None else None
             if hash_start is not None and hash_stop is not None and hash_start >= hash_stop:
                 raise ValueError('Impossible to iterate backwards.')
             elif hash_start is None: # begins from the first leaf node if start is not given
@@ -353,24 +435,22 @@ class BPlusTree:
                 pos = 0
             else:
                 try:
-                    leaf = self._find_target_leaf(hash_start)
-                    pos = bisect_left(leaf.keys, hash_start)
+                    leaf, pos, _ = self._locate(hash_start)
                 except TypeError:
                     raise TypeError('Uncomparable key type, check hashing function.')
                 else:
-                    if pos >= len(leaf.keys): # in case where start value does not exist
-                        leaf, pos = leaf.next, 0
+                    if pos >= len(leaf._keys): # in case where start value does not exist
+                        leaf, pos = leaf._next, 0
                         if not leaf:
                             return
-        if leaf.empty: # in case the whole tree is empty
-            return
-        while not slice_ or hash_stop is None or leaf.keys[pos] < hash_stop:
-            yield leaf.keys[pos], leaf.values[pos]
-            pos += 1
-            if pos >= len(leaf.keys):
-                leaf, pos = leaf.next, 0
-                if not leaf:
-                    break
+        while leaf is not None: # leaf attributes are read once per leaf, not per item
+            keys, values = leaf._keys, leaf._values
+            end = len(keys) if hash_stop is None else _bl(keys, hash_stop, pos)
+            for i in range(pos, end):
+                yield keys[i], values[i]
+            if end < len(keys): # stop value reached
+                return
+            leaf, pos = leaf._next, 0
 
     #endregion
 
@@ -378,35 +458,32 @@ class BPlusTree:
 
     def __contains__(self, key):
         try:
-            self.search(key)
-        except ValueError:
-            return False
-        else:
-            return True
+            _, _, found = self._locate(key if self._hash_identity else self._hash_func(key))
+        except TypeError:
+            raise TypeError('Uncomparable key type or not callable hash function.')
+        return found
 
     def __setitem__(self, key, value):
         self.insert(key, value, update=True)
 
     def __getitem__(self, key):
         if isinstance(key, slice): # return a dictionary if get by slice
-            res = {}
-            for k, v in self._iterate_by_slice(key):
-                res[k] = v
-            return res
+            return dict(self._iterate_by_slice(key))
         return self.search(key)
 
     def __len__(self):
         return self.len
 
     def __iter__(self, slice_: Optional[slice] = None):
-        for k, _ in self._iterate_by_slice(slice_):
-            yield k
+        if slice_ is None: # whole tree, chain the keys of leaf nodes
+            return chain.from_iterable(leaf._keys for leaf in self._iterate_leaves())
+        return (k for k, _ in self._iterate_by_slice(slice_))
 
     #endregion
 
     #region Public methods
 
-    def search(self, key):
+    def search(self, key, *, _br=bisect_right, _bl=bisect_left):
         """Search value by key.
 
         Args:
@@ -421,17 +498,23 @@ class BPlusTree:
 
         """
         try:
-            hash_key = self.hash_func(key)
-            dest = self._find_target_leaf(hash_key)
-            pos = bisect_left(dest.keys, hash_key) # search the appearance location
+            hash_key = key if self._hash_identity else self._hash_func(key)
+            dest = self._root
+            children = dest._children
+            while children: # iterate to the target leaf node, inlined as the hottest lookup path
+                dest = children[_br(dest._keys, hash_key)]
+                children = dest._children
+            keys = dest._keys
+            pos = _bl(keys, hash_key)
+            found = pos < len(keys) and keys[pos] == hash_key
         except TypeError:
             raise TypeError('Uncomparable key type or not callable hash function.')
         else:
-            if dest.empty or pos >= len(dest.keys) or dest.keys[pos] != hash_key:
+            if not found:
                 raise ValueError(f'[{key}] key doesn\'t exist.')
-            return dest.values[pos]
+            return dest._values[pos]
 
-    def insert(self, key, value, update: bool = False):
+    def insert(self, key, value, update: bool = False, *, _br=bisect_right, _bl=bisect_left):
         """Insert the (key, value) pair into the tree
 
         Args:
@@ -448,26 +531,46 @@ class BPlusTree:
 
         """
         try:
-            hash_key = self.hash_func(key)
-            dest = self._find_target_leaf(hash_key)
-            pos = bisect_right(dest.keys, hash_key) # search the insert location
+            hash_key = key if self._hash_identity else self._hash_func(key)
+            dest = self._last_leaf
+            if dest._keys and dest._keys[-1] < hash_key: # greater than all keys, append to the last leaf node
+                path, pos, found = None, len(dest._keys), False
+            else:
+                dest = self._root
+                path, indexes = [dest], [] # record the descent path for splitting
+                children = dest._children
+                while children: # iterate to the target leaf node
+                    pos = _br(dest._keys, hash_key)
+                    dest = children[pos]
+                    path.append(dest)
+                    indexes.append(pos)
+                    children = dest._children
+                pos = _bl(dest._keys, hash_key) # search the insert location
+                found = pos < len(dest._keys) and dest._keys[pos] == hash_key
         except TypeError:
             raise TypeError('Uncomparable key type, check hashing function.')
         else:
-            if not dest.empty and dest.keys[pos-1] == hash_key: # key already exists
+            if found: # key already exists
                 if update:
-                    dest.values[pos-1] = value
-                    logger.info(f'[{key}] updated value to: {value}.')
+                    dest._values[pos] = value
+                    logger.info('[%s] updated value to: %s.', key, value)
                 else:
                     raise ValueError(f'[{key}] key already exists.')
             else:
-                dest.keys.insert(pos, hash_key) # insert key into list in a sorted manner
-                dest.values.insert(pos, value)
-            self._split_node(dest)
-            self.len += 1
-            logger.info(f'[{key}] added value: {value}.')
-
-    def delete(self, key):
+                dest._values.insert(pos, value) # arrays may reject the value or the key, keep the pair atomic
+                try:
+                    dest._keys.insert(pos, hash_key) # insert key into list in a sorted manner
+                except Exception:
+                    del dest._values[pos]
+                    raise
+                if len(dest._keys) >= self._order:
+                    if path is None: # appended without descending
+                        path, indexes = self._last_path()
+                    self._split_node(path, indexes)
+                self.len += 1 # only new keys are counted
+                logger.info('[%s] added value: %s.', key, value)
+
+    def delete(self, key, *, _br=bisect_right, _bl=bisect_left):
         """Delete the key from the tree
 
         Args:
@@ -482,31 +585,160 @@ class BPlusTree:
 
         """
         try:
-            hash_key = self.hash_func(key)
-            dest = self._find_target_leaf(hash_key)
-            pos = bisect_left(dest.keys, hash_key)
+            hash_key = key if self._hash_identity else self._hash_func(key)
+            dest = self._root
+            path, indexes = [dest], [] # record the descent path for fixing
+            children = dest._children
+            while children: # iterate to the target leaf node
+                pos = _br(dest._keys, hash_key)
+                dest = children[pos]
+                path.append(dest)
+                indexes.append(pos)
+                children = dest._children
+            pos = _bl(dest._keys, hash_key)
+            found = pos < len(dest._keys) and dest._keys[pos] == hash_key
         except TypeError:
             raise TypeError('Uncomparable key type, check hashing function.')
         else:
-            if dest.empty or pos >= len(dest.keys) or dest.keys[pos] != hash_key:
+            if not found:
                 raise ValueError(f'[{key}] key doesn\'t exist.')
-            dest.keys.pop(pos)
-            dest.values.pop(pos)
-            self._fix_node(dest)
+            dest._keys.pop(pos)
+            dest._values.pop(pos)
+            if len(dest._keys) < self._min_keys:
+                self._fix_node(path, indexes)
             self.len -= 1
-            logger.info(f'[{key}] deleted.')
+            logger.info('[%s] deleted.', key)
+
+    def delete_many(self, keys: Iterable, *, _br=bisect_right, _bl=bisect_left):
+        """Delete several keys from the tree
+
+        Keys are sorted, then removed leaf by leaf: the tree is descended once per leaf node,
+        all the keys it holds are removed in one pass and the node is fixed once.
+
+        Args:
+            keys (Iterable): the keys to remove
+
+        Returns:
+            None
+            
+        Raises:
+            ValueError: if a key does not exist, keys sorted before it are deleted.
+            TypeError: if key not comparable or hash function not callable
+
+        """
+        try:
+            items = sorted(((key if self._hash_identity else self._hash_func(key), key) for key in keys), key=itemgetter(0))
+        except TypeError:
+            raise TypeError('Uncomparable key type, check hashing function.')
+        i, n = 0, len(items)
+        while i < n:
+            try:
+                dest = self._root
+                path, indexes = [dest], [] # record the descent path for fixing
+                stop = None # the leaf node only holds keys below the closest splitting key on the right
+                children = dest._children
+                while children: # iterate to the target leaf node of the smallest key left
+                    pos = _br(dest._keys, items[i][0])
+                    if pos < len(dest._keys):
+                        stop = dest._keys[pos]
+                    dest = children[pos]
+                    path.append(dest)
+                    indexes.append(pos)
+                    children = dest._children
+                leaf_keys, positions, missing = dest._keys, [], None
+                while i < n and (stop is None or items[i][0] < stop): # collect the keys held by this leaf node
+                    hash_key, key = items[i]
+                    pos = _bl(leaf_keys, hash_key, positions[-1]+1 if positions else 0)
+                    if pos >= len(leaf_keys) or leaf_keys[pos] != hash_key:
+                        missing = key
+                        break
+                    positions.append(pos)
+                    i += 1
+            except TypeError:
+                raise TypeError('Uncomparable key type, check hashing function.')
+            for pos in reversed(positions):
+                del leaf_keys[pos], dest._values[pos]
+            self.len -= len(positions)
+            if len(leaf_keys) < self._min_keys:
+                self._fix_node(path, indexes)
+            logger.info('%s keys deleted.', len(positions))
+            if missing is not None:
+                raise ValueError(f'[{missing}] key doesn\'t exist.')
+
+    def bulk_load(self, items: Iterable[tuple]):
+        """Build the tree from (key, value) pairs in one pass
+
+        Pairs are sorted by key, then the tree is built bottom-up: leaf nodes are filled up to
+        three quarters of the order and linked together, then each level of inner nodes is built
+        upon the previous one until a single root is left. No splitting happens.
+
+        Args:
+            items (Iterable): the (key, value) pairs to load
+
+        Returns:
+            None
+            
+        Raises:
+            ValueError: if the tree is not empty or a key is duplicated.
+            TypeError: if key not comparable or hash function not callable
+
+        """
+        if self._root._keys:
+            raise ValueError('Bulk loading requires an empty tree.')
+        try:
+            items = sorted(((key if self._hash_identity else self._hash_func(key), key, value) for key, value in items), key=itemgetter(0))
+            for a, b in zip(items, items[1:]):
+                if a[0] == b[0]:
+                    raise ValueError(f'[{b[1]}] key already exists.')
+        except TypeError:
+            raise TypeError('Uncomparable key type, check hashing function.')
+        if not items:
+            return
+        order, node_min, int_keys = self._order, self._min_keys, self._int_keys
+        fill = max(1, min(order-1, max(node_min, order*3//4))) # number of keys per node
+        level, lows, start = [], [], 0 # nodes of current level and their smallest key
+        for size in _group_sizes(len(items), fill, node_min, order-1):
+            leaf = BPlusTree_Node(order, int_keys=int_keys, value_dtype=self._value_dtype)
+            leaf._keys.extend(item[0] for item in items[start:start+size])
+            leaf._values.extend(item[2] for item in items[start:start+size])
+            if level:
+                level[-1]._next = leaf
+            level.append(leaf)
+            lows.append(leaf._keys[0])
+            start += size
+        self._leaf, self._last_leaf = level[0], level[-1]
+        while len(level) > 1: # build the upper level
+            parents, parent_lows, start = [], [], 0
+            for size in _group_sizes(len(level), fill+1, node_min+1, order):
+                parent = BPlusTree_Node(order, int_keys=int_keys)
+                parent._level = level[start]._level + 1
+                parent._children = level[start:start+size]
+                parent._keys.extend(lows[start+1:start+size]) # splitting keys are the smallest keys of the right children
+                for left, right in zip(parent._children, parent._children[1:]): # brothers share the same parent
+                    left._right, right._left = right, left
+                for child in parent._children:
+                    child._parent = parent
+                parents.append(parent)
+                parent_lows.append(lows[start])
+                start += size
+            level, lows = parents, parent_lows
+        self._root = level[0]
+        self.len = len(items)
+        logger.info('%s items loaded.', len(items))
 
     def clear(self):
         """Clear all items in the tree."""
-        self._leaf = self._root = BPlusTree_Node(self._order)
+        self.len = 0
+        self._leaf = self._root = self._last_leaf = BPlusTree_Node(self._order, int_keys=self._int_keys, value_dtype=self._value_dtype)
 
     def summary(self):
         """Display the tree nodes in a BFS manner. (For test in small amount only)"""
-        queue = [self._root]
+        queue = deque([self._root])
+        top = self._root._level
         while queue:
-            cur = queue.pop(0)
-            print(f'height: {cur.height}\n{cur.keys}\n')
-            queue += cur.children
+            cur = queue.popleft()
+            print(f'height: {top-cur._level}\n{cur._keys}\n')
+            queue.extend(cur._children)
 
     def items(self, slice_: Optional[slice] = None) -> Iterator[tuple]:
         """Iterate (key, value) pairs
@@ -521,6 +753,8 @@ class BPlusTree:
             ValueError: if start value is no less than stop or a custom step is specified.
 
         """
+        if slice_ is None: # whole tree, chain the pairs of leaf nodes
+            return chain.from_iterable(zip(leaf._keys, leaf._values) for leaf in self._iterate_leaves())
         return self._iterate_by_slice(slice_)
 
     keys = __iter__
@@ -538,7 +772,8 @@ class BPlusTree:
             ValueError: if start value is no less than stop or a custom step is specified.
 
         """
-        for _, v in self._iterate_by_slice(slice_):
-            yield v
+        if slice_ is None: # whole tree, chain the values of leaf nodes
+            return chain.from_iterable(leaf._values for leaf in self._iterate_leaves())
+        return (v for _, v in self._iterate_by_slice(slice_))
 
     #endregion
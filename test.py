@@ -1,6 +1,7 @@
 import random
 import time
 import os
+import warnings
 from math import pow
 
 from BPlusTree import BPlusTree
@@ -8,13 +9,13 @@ from BPlusTree import BPlusTree
 def test_functional(tree: BPlusTree = None, order: int = 1000, amount: int = 10000):
     """Test the functionality of BPlusTree
 
-    1. Insert all elements and check length
+    1. Insert all elements and check length, also after updating existing ones
     2. Check existance of all elements
     3. Remove a random half of the elements
     4. Check existance of reserved ones and success of deletion
     5. Insert all elements back and check existance of all
-    6. Check tranversing iteration in the right order
-    7. Clear the tree and check all elements no longer in the tree
+    6. Check tranversing iteration of keys, items and values in the right order
+    7. Clear the tree and check it is empty and all elements no longer in the tree
 
     Args:
         tree (BPlusTree): optional b plus tree instance
@@ -30,6 +31,10 @@ def test_functional(tree: BPlusTree = None, order: int = 1000, amount: int = 100
     for k in random_list:
         bptree[k] = k
     assert(len(bptree) == amount)
+    # updating existing keys keeps the length
+    for k in random_list[:10]:
+        bptree[k] = k
+    assert(len(bptree) == amount)
     # check search
     for k in random_list:
         assert(bptree[k] == k)
@@ -54,11 +59,160 @@ def test_functional(tree: BPlusTree = None, order: int = 1000, amount: int = 100
     for k in bptree:
         assert(last_key is None or k > last_key) # keys in the right order
         last_key = k
+    # check items and values iterations, keys are iterated in their hashed form
+    expected = sorted((bptree.hash_func(k), k) for k in random_list)
+    assert(list(bptree.items()) == expected)
+    assert(list(bptree.values()) == [v for _, v in expected])
     # check clear
     bptree.clear()
+    assert(len(bptree) == 0)
     for k in random_list:
         assert(k not in bptree)
 
+def test_delete_many(tree: BPlusTree = None, order: int = 1000, amount: int = 10000):
+    """Test the batch deletion of BPlusTree
+
+    1. Insert all elements
+    2. Remove a random half of the elements in one batch and check length
+    3. Check existance of reserved ones and success of deletion
+    4. Check a batch with a missing key raises an error after deleting the keys before it
+    5. Check a batch with an uncomparable key raises a type error
+    6. Remove all remaining elements in one batch and check the tree is empty
+
+    Args:
+        tree (BPlusTree): optional b plus tree instance
+        order (int): order of the tree
+        amount (int): amount of elements to test with
+    Returns:
+        None
+
+    """
+    random_list = random.sample(range(amount*10), amount)
+    bptree = BPlusTree(order) if tree is None else tree
+    for k in random_list:
+        bptree[k] = k
+    # remove a half of keys in one batch
+    delete_list = random.sample(random_list, int(amount/2))
+    bptree.delete_many(delete_list)
+    assert(len(bptree) == amount-len(delete_list))
+    delete_set = set(delete_list)
+    for k in random_list:
+        assert((k in bptree) == (k not in delete_set))
+    # a missing key stops the batch
+    reserved = sorted(k for k in random_list if k not in delete_set)
+    try:
+        bptree.delete_many([reserved[0], reserved[1]+0.5, reserved[2]])
+    except ValueError:
+        pass
+    else:
+        assert(False)
+    before, after = sorted([reserved[0], reserved[2]], key=bptree.hash_func) # keys are deleted in hashed order
+    assert(before not in bptree and after in bptree)
+    # an uncomparable key raises the wrapped type error
+    try:
+        bptree.delete_many(['a'])
+    except TypeError as e:
+        assert(str(e) == 'Uncomparable key type, check hashing function.')
+    else:
+        assert(False)
+    # remove all remaining keys
+    bptree.delete_many([reserved[1], after] + reserved[3:])
+    assert(len(bptree) == 0)
+    assert(list(bptree) == [])
+
+def test_bulk_load(tree: BPlusTree = None, order: int = 1000, amount: int = 10000):
+    """Test the bulk loading of BPlusTree
+
+    1. Load all elements in one pass and check length
+    2. Check existance of all and tranversing iteration in the right order
+    3. Insert and delete elements afterwards and check the tree stays consistent
+    4. Clear the tree and load all elements again
+
+    Args:
+        tree (BPlusTree): optional b plus tree instance
+        order (int): order of the tree
+        amount (int): amount of elements to test with
+    Returns:
+        None
+
+    """
+    random_list = random.sample(range(amount*10), amount)
+    bptree = BPlusTree(order) if tree is None else tree
+    bptree.bulk_load((k, k) for k in random_list)
+    assert(len(bptree) == amount)
+    for k in random_list:
+        assert(bptree[k] == k)
+    assert(list(bptree) == sorted(random_list))
+    # the loaded tree keeps working with regular operations
+    for k in range(amount*10, amount*11):
+        bptree[k] = k
+    for k in random_list:
+        bptree.delete(k)
+    assert(list(bptree) == list(range(amount*10, amount*11)))
+    # a cleared tree can be loaded again
+    bptree.clear()
+    bptree.bulk_load((k, k) for k in random_list)
+    assert(list(bptree) == sorted(random_list))
+
+def test_hash_func(order: int = 1000, amount: int = 10000):
+    """Test BPlusTree with a custom hashing function
+
+    1. Run the functionality test with a hashing function given at construction
+    2. Run the functionality and batch deletion tests with a hashing function set afterwards
+    3. Reset the hashing function to identity and check keys are iterated as they are
+
+    Args:
+        order (int): order of the tree
+        amount (int): amount of elements to test with
+    Returns:
+        None
+
+    """
+    test_functional(tree=BPlusTree(order, hash_func=lambda k: -k), order=order, amount=amount)
+    bptree = BPlusTree(order)
+    bptree.hash_func = lambda k: -k
+    test_functional(tree=bptree, order=order, amount=amount)
+    test_delete_many(tree=bptree, order=order, amount=amount)
+    # back to identity
+    bptree.hash_func = None
+    random_list = random.sample(range(amount*10), amount)
+    for k in random_list:
+        bptree[k] = k
+    assert(list(bptree.items()) == sorted((k, k) for k in random_list))
+
+def test_rejected_insert(order: int = 1000, amount: int = 10000):
+    """Test that compact arrays rejecting a key or a value leave the tree unchanged
+
+    1. Insert all elements into a tree storing keys and values in arrays
+    2. Insert keys rejected by the key array (float and too large) and check errors
+    3. Insert a value rejected by the value array and check error
+    4. Check length, existance and values of all elements, also for the last leaf
+
+    Args:
+        order (int): order of the tree
+        amount (int): amount of elements to test with
+    Returns:
+        None
+
+    """
+    random_list = random.sample(range(amount*10), amount)
+    bptree = BPlusTree(order, int_keys=True, value_dtype='q')
+    for k in random_list:
+        bptree[k] = k
+    middle, last = sorted(random_list)[amount//2], max(random_list)
+    for key, value, error in [(middle+0.5, 0, TypeError), (2**70, 0, OverflowError), # rejected keys
+                              (middle+0.5, 'x', TypeError), (last+1, 'x', TypeError)]: # rejected values
+        try:
+            bptree.insert(key, value)
+        except error:
+            pass
+        else:
+            assert(False)
+    assert(len(bptree) == amount)
+    for k in random_list:
+        assert(bptree[k] == k)
+    assert(list(bptree.items()) == sorted((k, k) for k in random_list))
+
 def test_speed(tree: BPlusTree = None, order: int = 1000, amount: int = 100000, filename: str=''):
     """Test speed of insertion, search and deletion
 
@@ -110,8 +264,19 @@ def test_speed(tree: BPlusTree = None, order: int = 1000, amount: int = 100000,
     print(res)
 
 if __name__ == '__main__':
+    with warnings.catch_warnings(): # small orders warn on construction, their merges and borrows still have to hold
+        warnings.simplefilter('ignore', RuntimeWarning)
+        for order in [3, 4]:
+            test_functional(order=order, amount=1000)
+            test_delete_many(order=order, amount=1000)
     for order in [20, 50, 100, 500, 1000]:
         test_functional(order=order)
+        test_functional(tree=BPlusTree(order, int_keys=True), order=order)
+        test_functional(tree=BPlusTree(order, int_keys=True, value_dtype='q'), order=order)
+        test_delete_many(order=order)
+        test_bulk_load(order=order)
+        test_rejected_insert(order=order)
+        test_hash_func(order=order)
     for amount in [int(pow(10, p)) for p in [6, 7, 8]]:
         test_speed(order=1000, amount=amount, filename='test_result.txt')
     print('All tests passed.')